@@ -1,13 +1,24 @@
+import gzip
 import os
+import time
 from datetime import datetime, timezone
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import injury_prediction
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import history_store
 from player_value import apply_availability_adjustment, calc_fantasy_value, to_float
 import trades as team_trades
-import yahoo_fantasy_api as yfa
-from yahoo_oauth import OAuth2
+import yahoo_session
+
+# yahoo_fantasy_api, yahoo_oauth and injury_prediction (pandas, scikit-learn,
+# nba_api) are imported where first needed so light endpoints start fast.
+MIN_COMPRESS_BYTES = 1024
 
 
 def load_dotenv(path=None):
@@ -77,24 +88,22 @@ def resolve_context_args(league_id=None, team_number=None):
     return league_key, team_key
 
 
-def build_context(league_id=None, team_number=None, include_team=True):
+def get_oauth_session():
     load_dotenv()
-
-    game_code = os.getenv("YAHOO_GAME_CODE", "nba")
     oauth_file = resolve_local_path(os.getenv("YAHOO_OAUTH_FILE", "oauth2.json"))
-    league_key, team_key = resolve_context_args(league_id=league_id, team_number=team_number)
+    return yahoo_session.get_oauth_session(oauth_file)
+
 
-    sc = OAuth2(None, None, from_file=oauth_file)
-    gm = yfa.Game(sc, game_code)
-    league = gm.to_league(league_key)
+def build_context(league_id=None, team_number=None, include_team=True):
+    league_key, team_key = resolve_context_args(league_id=league_id, team_number=team_number)
+    league, team_key = team_trades.build_context(league_key=league_key, team_key=team_key)
     if include_team:
-        team = league.to_team(team_key)
-        return gm, league, team
-    return gm, league, None
+        return league, league.to_team(team_key)
+    return league, None
 
 
 def get_team_roster(league_id=None, team_number=None):
-    _, _, team = build_context(league_id=league_id, team_number=team_number)
+    _, team = build_context(league_id=league_id, team_number=team_number)
     return team.roster()
 
 
@@ -112,6 +121,7 @@ def build_player_value_payload(player, stats, risk_payload):
         "availability_probability": risk_fields["availability_probability"],
         "injury_risk_source": risk_fields["injury_risk_source"],
         "risk_adjusted_fantasy_value": risk_fields["risk_adjusted_fantasy_value"],
+        "upcoming_games_7d": (risk_payload or {}).get("upcoming_games_7d"),
         "stats": {
             "FG%": to_float(stats.get("FG%")),
             "FT%": to_float(stats.get("FT%")),
@@ -126,13 +136,17 @@ def build_player_value_payload(player, stats, risk_payload):
     }
 
 
-def compute_players_with_values(league, roster):
-    ids = [p["player_id"] for p in roster if p.get("player_id")]
+def fetch_stats_and_risk(league, roster, allow_training=None):
+    import injury_prediction
+
+    ids = list(dict.fromkeys(p["player_id"] for p in roster if p.get("player_id")))
     stat_lines = league.player_stats(ids, "season") if ids else []
     stat_by_id = {s.get("player_id"): s for s in stat_lines}
-    risk_result = injury_prediction.predict_injury_risk_for_players(roster)
-    risk_map = risk_result.get("risk_by_player_name", {})
+    risk_result = injury_prediction.predict_injury_risk_for_players(roster, allow_training=allow_training)
+    return stat_by_id, risk_result
+
 
+def value_roster(roster, stat_by_id, risk_map):
     players = []
     for player in roster:
         pid = player.get("player_id")
@@ -141,19 +155,198 @@ def compute_players_with_values(league, roster):
         players.append(build_player_value_payload(player, stats, risk_payload))
 
     players.sort(key=lambda x: x["fantasy_value"], reverse=True)
+    return players
+
+
+def compute_players_with_values(league, roster):
+    stat_by_id, risk_result = fetch_stats_and_risk(league, roster)
+    players = value_roster(roster, stat_by_id, risk_result.get("risk_by_player_name", {}))
     return players, risk_result
 
 
 def get_roster_with_values(league_id=None, team_number=None):
-    _, league, team = build_context(league_id=league_id, team_number=team_number)
+    league, team = build_context(league_id=league_id, team_number=team_number)
     roster = team.roster()
     players, risk_result = compute_players_with_values(league, roster)
     return players, risk_result
 
 
+def summarize_players(players, risk_result):
+    highest = players[0]
+    lowest = players[-1]
+    average = round(
+        sum(player["fantasy_value"] for player in players) / len(players),
+        2,
+    )
+    return {
+        "highest_player": highest["name"],
+        "highest_value": highest["fantasy_value"],
+        "lowest_player": lowest["name"],
+        "lowest_value": lowest["fantasy_value"],
+        "average_value": average,
+        "risk_model_trained": risk_result.get("trained", False),
+        "risk_model_rows": risk_result.get("model_rows", 0),
+        "risk_model_note": risk_result.get("note", ""),
+    }
+
+
+def team_number_from_key(team_key):
+    if ".t." in str(team_key):
+        return str(team_key).split(".t.")[-1]
+    if str(team_key):
+        return str(team_key).split(".")[-1]
+    return ""
+
+
+def rank_by(items, key):
+    ordered = sorted(items, key=lambda item: item[key], reverse=True)
+    return {item["team_key"]: position for position, item in enumerate(ordered, start=1)}
+
+
+def build_league_dashboard(league_id=None):
+    league_key, _ = resolve_context_args(league_id=league_id, team_number=None)
+    league, _ = build_context(league_id=league_id, team_number=None, include_team=False)
+    teams = [meta for meta in team_trades.get_league_teams(league) if meta.get("team_key")]
+    rosters = {meta["team_key"]: league.to_team(meta["team_key"]).roster() for meta in teams}
+
+    # One stats call and one risk pass for the whole league instead of one per team.
+    # Risk comes only from the published model so the endpoint never trains in-request.
+    all_players = [player for roster in rosters.values() for player in roster]
+    stat_by_id, risk_result = fetch_stats_and_risk(league, all_players, allow_training=False)
+    risk_map = risk_result.get("risk_by_player_name", {})
+
+    team_payloads = []
+    for meta in teams:
+        team_key = meta["team_key"]
+        players = value_roster(rosters[team_key], stat_by_id, risk_map)
+        record_value_history(players, risk_result, league_key, team_key)
+        total_value = round(sum(player["fantasy_value"] for player in players), 2)
+        total_adjusted = round(sum(player["risk_adjusted_fantasy_value"] for player in players), 2)
+        average_risk = (
+            round(sum(player["injury_risk_probability"] for player in players) / len(players), 4)
+            if players
+            else 0.0
+        )
+        team_payloads.append(
+            {
+                "team_key": team_key,
+                "team_name": str(meta.get("name", "")).strip(),
+                "team_number": team_number_from_key(team_key),
+                "summary": summarize_players(players, risk_result) if players else {},
+                "totals": {
+                    "fantasy_value": total_value,
+                    "risk_adjusted_fantasy_value": total_adjusted,
+                    "average_injury_risk": average_risk,
+                },
+                "players": players,
+            }
+        )
+
+    totals = [{"team_key": item["team_key"], **item["totals"]} for item in team_payloads]
+    value_rank = rank_by(totals, "fantasy_value")
+    adjusted_rank = rank_by(totals, "risk_adjusted_fantasy_value")
+    for item in team_payloads:
+        item["rankings"] = {
+            "fantasy_value": value_rank[item["team_key"]],
+            "risk_adjusted_fantasy_value": adjusted_rank[item["team_key"]],
+        }
+    team_payloads.sort(key=lambda item: item["rankings"]["fantasy_value"])
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "league_key": league_key,
+        "model": {
+            "trained": risk_result.get("trained", False),
+            "rows": risk_result.get("model_rows", 0),
+            "note": risk_result.get("note", ""),
+        },
+        "teams": team_payloads,
+    }
+
+
+def parse_field_list(value):
+    if not value:
+        return None
+    return {item.strip() for item in str(value).split(",") if item.strip()}
+
+
+def select_fields(item, fields, always=()):
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields or key in always}
+
+
+def compressed_jsonify(payload, status=200):
+    response = jsonify(payload)
+    response.status_code = status
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding == "br":
+        response.set_data(brotli.compress(body))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(body, compresslevel=6))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def record_value_history(players, risk_result, league_key, team_key):
+    # Status-default risk is a placeholder, not a model output; storing it would let
+    # the daily trend flip depending on which endpoint ran last.
+    if not risk_result.get("trained", False):
+        return
+    try:
+        history_store.record_player_snapshots(league_key, team_key, players)
+    except Exception:
+        # History is best-effort; a storage failure must not break live responses.
+        pass
+
+
+def warm_up():
+    import injury_prediction
+    import nba_schedule
+
+    timings = {}
+    started = time.perf_counter()
+    timings["model_loaded"] = injury_prediction.warm_up_model()
+    timings["model_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+
+    started = time.perf_counter()
+    nba_schedule.load_schedule_index()
+    timings["schedule_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+
+    started = time.perf_counter()
+    injury_prediction.load_player_name_index()
+    timings["name_index_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+
+    started = time.perf_counter()
+    try:
+        get_oauth_session()
+        timings["oauth_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+    except Exception:
+        # Missing credentials should not stop the worker; requests will surface the error.
+        timings["oauth_ms"] = None
+    return timings
+
+
+def warm_up_enabled():
+    load_dotenv()
+    return os.getenv("APP_WARMUP", "").strip().lower() in ("1", "true", "yes")
+
+
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+if warm_up_enabled():
+    # Runs at import, i.e. when a WSGI worker boots and before it accepts requests.
+    app.config["WARMUP_TIMINGS"] = warm_up()
+
 
 @app.get("/api/team")
 def team():
@@ -167,30 +360,17 @@ def team():
 def team_value_stats():
     league_id = request.args.get("league_id")
     team_number = request.args.get("team_number")
+    league_key, team_key = resolve_context_args(league_id=league_id, team_number=team_number)
     players, risk_result = get_roster_with_values(league_id=league_id, team_number=team_number)
+    record_value_history(players, risk_result, league_key, team_key)
     if not players:
         return jsonify({"players": [], "summary": {}}), 200
 
-    highest = players[0]
-    lowest = players[-1]
-    average = round(
-        sum(player["fantasy_value"] for player in players) / len(players),
-        2,
-    )
     return (
         jsonify(
             {
                 "generated_at": datetime.now(timezone.utc).isoformat(),
-                "summary": {
-                    "highest_player": highest["name"],
-                    "highest_value": highest["fantasy_value"],
-                    "lowest_player": lowest["name"],
-                    "lowest_value": lowest["fantasy_value"],
-                    "average_value": average,
-                    "risk_model_trained": risk_result.get("trained", False),
-                    "risk_model_rows": risk_result.get("model_rows", 0),
-                    "risk_model_note": risk_result.get("note", ""),
-                },
+                "summary": summarize_players(players, risk_result),
                 "players": players,
             }
         ),
@@ -219,7 +399,9 @@ def trade_compare():
 def team_injury_prediction_values():
     league_id = request.args.get("league_id")
     team_number = request.args.get("team_number")
+    league_key, team_key = resolve_context_args(league_id=league_id, team_number=team_number)
     players, risk_result = get_roster_with_values(league_id=league_id, team_number=team_number)
+    record_value_history(players, risk_result, league_key, team_key)
     ordered = sorted(players, key=lambda x: x["risk_adjusted_fantasy_value"], reverse=True)
     return (
         jsonify(
@@ -237,31 +419,63 @@ def team_injury_prediction_values():
     )
 
 
+@app.get("/api/players/<player_id>/history")
+def player_history(player_id):
+    start_date = request.args.get("start")
+    end_date = request.args.get("end")
+    history = history_store.get_player_history(player_id, start_date=start_date, end_date=end_date)
+    return jsonify({"player_id": player_id, "history": history}), 200
+
+
+@app.get("/api/team/history")
+def team_history():
+    league_id = request.args.get("league_id")
+    team_number = request.args.get("team_number")
+    start_date = request.args.get("start")
+    end_date = request.args.get("end")
+    _, team_key = resolve_context_args(league_id=league_id, team_number=team_number)
+    trend = history_store.get_team_trend(team_key, start_date=start_date, end_date=end_date)
+    return jsonify({"team_key": team_key, "trend": trend}), 200
+
+
 @app.get("/api/league/teams")
 def league_teams():
     league_id = request.args.get("league_id")
     league_key, _ = resolve_context_args(league_id=league_id, team_number=None)
-    _, league, _ = build_context(league_id=league_id, team_number=None, include_team=False)
+    league, _ = build_context(league_id=league_id, team_number=None, include_team=False)
     teams = team_trades.get_league_teams(league)
     payload = []
     for team in teams:
         team_key = team.get("team_key", "")
-        team_number = ""
-        if ".t." in str(team_key):
-            team_number = str(team_key).split(".t.")[-1]
-        elif str(team_key):
-            team_number = str(team_key).split(".")[-1]
-
         team_name = str(team.get("name", "")).strip()
         payload.append(
             {
                 "team_key": team_key,
                 "team_name": team_name,
-                "team_number": team_number,
+                "team_number": team_number_from_key(team_key),
             }
         )
     return jsonify({"league_key": league_key, "teams": payload}), 200
 
 
+@app.get("/api/league/dashboard")
+def league_dashboard():
+    league_id = request.args.get("league_id")
+    team_fields = parse_field_list(request.args.get("fields"))
+    player_fields = parse_field_list(request.args.get("player_fields"))
+    dashboard = build_league_dashboard(league_id=league_id)
+
+    teams = []
+    for item in dashboard["teams"]:
+        selected = select_fields(item, team_fields, always=("team_key",))
+        if "players" in selected:
+            selected["players"] = [
+                select_fields(player, player_fields, always=("player_id",)) for player in selected["players"]
+            ]
+        teams.append(selected)
+    dashboard["teams"] = teams
+    return compressed_jsonify(dashboard)
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
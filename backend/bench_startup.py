@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+# Each measurement runs in a fresh interpreter so module caches never carry over.
+_PROBE = """
+import json
+import os
+import sys
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+status = app.app.test_client().get(os.environ["BENCH_PATH"]).status_code
+responded = time.perf_counter()
+print(json.dumps({
+    "import_ms": round((imported - started) * 1000.0, 1),
+    "first_response_ms": round((responded - started) * 1000.0, 1) if status == 200 else None,
+    "status": status,
+    "warmup": app.app.config.get("WARMUP_TIMINGS"),
+    "heavy_modules_loaded": sorted(
+        name for name in ("pandas", "numpy", "sklearn", "nba_api", "yahoo_fantasy_api")
+        if name in sys.modules
+    ),
+}))
+"""
+
+
+def run_probe(path, warmup):
+    env = dict(os.environ)
+    env["APP_WARMUP"] = "1" if warmup else "0"
+    env["BENCH_PATH"] = path
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:] or ["probe failed"]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(paths, repeat=3):
+    results = []
+    for path in paths:
+        for warmup in (False, True):
+            samples = [run_probe(path, warmup) for _ in range(repeat)]
+            results.append({"path": path, "warmup": warmup, "samples": samples})
+    return {"recorded_at": datetime.now(timezone.utc).isoformat(), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app import time and time to first successful response.")
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to probe; may be repeated.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--record", help="Append the result as one JSON line to this file for tracking over time.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.paths or ["/api/league/teams", "/api/team/value-stats"], repeat=args.repeat)
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as file_handle:
+            file_handle.write(json.dumps(report) + "\n")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timezone
+
+
+DEFAULT_HISTORY_FILE = "history.db"
+_SCHEMA_LOCK = threading.Lock()
+_INITIALIZED_PATHS = set()
+
+# Keys, names and timestamps live once in small dimension tables; each snapshot
+# row is integer references, a day number and the three numeric values.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    league_key TEXT NOT NULL,
+    team_key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    player_id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS risk_sources (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    team_ref INTEGER NOT NULL REFERENCES teams (id),
+    snapshot_date TEXT NOT NULL,
+    captured_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_captures_team_date
+    ON captures (team_ref, snapshot_date, captured_at);
+CREATE TABLE IF NOT EXISTS value_snapshots (
+    capture_ref INTEGER NOT NULL REFERENCES captures (id),
+    player_ref INTEGER NOT NULL REFERENCES players (id),
+    snapshot_day INTEGER NOT NULL,
+    fantasy_value REAL NOT NULL,
+    injury_risk_probability REAL NOT NULL,
+    risk_adjusted_fantasy_value REAL NOT NULL,
+    source_ref INTEGER NOT NULL REFERENCES risk_sources (id),
+    PRIMARY KEY (capture_ref, player_ref)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_value_snapshots_player_day
+    ON value_snapshots (player_ref, snapshot_day);
+"""
+
+
+def resolve_history_path(path_value=None):
+    value = path_value or os.getenv("HISTORY_DB_FILE", DEFAULT_HISTORY_FILE)
+    if os.path.isabs(value):
+        return value
+    return os.path.join(os.path.dirname(__file__), value)
+
+
+def _connect(path_value=None):
+    db_path = resolve_history_path(path_value)
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    if db_path not in _INITIALIZED_PATHS:
+        with _SCHEMA_LOCK:
+            if db_path not in _INITIALIZED_PATHS:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+                _INITIALIZED_PATHS.add(db_path)
+    return connection
+
+
+def _date_bound(value):
+    if not value:
+        return None
+    return str(value)[:10]
+
+
+def _day_number(value):
+    # Proleptic ordinal of the date; the player index ranges over this integer.
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _dimension_id(connection, table, key_column, key_value, extra=None):
+    extra = extra or {}
+    selected = ", ".join(["id", *extra])
+    row = connection.execute(f"SELECT {selected} FROM {table} WHERE {key_column} = ?", (key_value,)).fetchone()
+    if row is not None:
+        changed = {column: value for column, value in extra.items() if row[column] != value}
+        if changed:
+            assignments = ", ".join(f"{column} = ?" for column in changed)
+            connection.execute(
+                f"UPDATE {table} SET {assignments} WHERE id = ?",
+                (*changed.values(), row["id"]),
+            )
+        return row["id"]
+    columns = [key_column, *extra]
+    placeholders = ", ".join("?" for _ in columns)
+    cursor = connection.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        (key_value, *extra.values()),
+    )
+    return cursor.lastrowid
+
+
+def _latest_capture_values(connection, team_ref, snapshot_date):
+    capture = connection.execute(
+        """
+        SELECT id FROM captures
+        WHERE team_ref = ? AND snapshot_date = ?
+        ORDER BY captured_at DESC
+        LIMIT 1
+        """,
+        (team_ref, snapshot_date),
+    ).fetchone()
+    if capture is None:
+        return None
+    rows = connection.execute(
+        """
+        SELECT player_ref, fantasy_value, injury_risk_probability,
+               risk_adjusted_fantasy_value, source_ref
+        FROM value_snapshots
+        WHERE capture_ref = ?
+        """,
+        (capture["id"],),
+    ).fetchall()
+    return {tuple(row) for row in rows}
+
+
+def record_player_snapshots(league_key, team_key, players, captured_at=None, path_value=None):
+    captured_at = captured_at or datetime.now(timezone.utc).isoformat()
+    snapshot_date = captured_at[:10]
+    players = [player for player in players if player.get("player_id")]
+    if not players:
+        return 0
+
+    connection = _connect(path_value)
+    try:
+        with connection:
+            team_ref = _dimension_id(connection, "teams", "team_key", str(team_key), {"league_key": str(league_key)})
+            rows = set()
+            for player in players:
+                player_ref = _dimension_id(
+                    connection,
+                    "players",
+                    "player_id",
+                    str(player["player_id"]),
+                    {"name": player.get("name", "Unknown")},
+                )
+                source_ref = _dimension_id(
+                    connection,
+                    "risk_sources",
+                    "source",
+                    player.get("injury_risk_source", "default"),
+                )
+                rows.add(
+                    (
+                        player_ref,
+                        float(player.get("fantasy_value", 0.0)),
+                        float(player.get("injury_risk_probability", 0.0)),
+                        float(player.get("risk_adjusted_fantasy_value", 0.0)),
+                        source_ref,
+                    )
+                )
+
+            # Repeated requests within a day usually return identical rosters; skip those.
+            if _latest_capture_values(connection, team_ref, snapshot_date) == rows:
+                return 0
+
+            capture_ref = connection.execute(
+                "INSERT INTO captures (team_ref, snapshot_date, captured_at) VALUES (?, ?, ?)",
+                (team_ref, snapshot_date, captured_at),
+            ).lastrowid
+            snapshot_day = _day_number(snapshot_date)
+            connection.executemany(
+                """
+                INSERT OR REPLACE INTO value_snapshots (
+                    capture_ref, player_ref, snapshot_day, fantasy_value,
+                    injury_risk_probability, risk_adjusted_fantasy_value, source_ref
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(capture_ref, row[0], snapshot_day, *row[1:]) for row in rows],
+            )
+    finally:
+        connection.close()
+    return len(rows)
+
+
+def get_player_history(player_id, start_date=None, end_date=None, path_value=None):
+    query = """
+        SELECT c.captured_at, c.snapshot_date, t.team_key, p.name, v.fantasy_value,
+               v.injury_risk_probability, v.risk_adjusted_fantasy_value,
+               r.source AS injury_risk_source
+        FROM players AS p
+        JOIN value_snapshots AS v ON v.player_ref = p.id
+        JOIN captures AS c ON c.id = v.capture_ref
+        JOIN teams AS t ON t.id = c.team_ref
+        JOIN risk_sources AS r ON r.id = v.source_ref
+        WHERE p.player_id = ?
+    """
+    params = [str(player_id)]
+    # Bounds on v.snapshot_day make the range part of the (player_ref, snapshot_day) index search.
+    if start_date and _day_number(start_date) is not None:
+        query += " AND v.snapshot_day >= ?"
+        params.append(_day_number(start_date))
+    if end_date and _day_number(end_date) is not None:
+        query += " AND v.snapshot_day <= ?"
+        params.append(_day_number(end_date))
+    query += " ORDER BY v.snapshot_day, c.captured_at"
+
+    connection = _connect(path_value)
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def get_team_trend(team_key, start_date=None, end_date=None, path_value=None):
+    # Each day reflects only the team's last capture, so dropped players fall out.
+    query = """
+        SELECT latest.snapshot_date AS snapshot_date,
+               COUNT(*) AS players,
+               ROUND(SUM(v.fantasy_value), 2) AS total_value,
+               ROUND(AVG(v.fantasy_value), 2) AS average_value,
+               ROUND(AVG(v.injury_risk_probability), 4) AS average_risk,
+               ROUND(SUM(v.risk_adjusted_fantasy_value), 2) AS total_risk_adjusted_value
+        FROM (
+            SELECT c.snapshot_date AS snapshot_date, MAX(c.captured_at) AS captured_at, c.team_ref AS team_ref
+            FROM captures AS c
+            JOIN teams AS t ON t.id = c.team_ref
+            WHERE t.team_key = ?{bounds}
+            GROUP BY c.snapshot_date
+        ) AS latest
+        JOIN captures AS c
+          ON c.team_ref = latest.team_ref
+         AND c.snapshot_date = latest.snapshot_date
+         AND c.captured_at = latest.captured_at
+        JOIN value_snapshots AS v ON v.capture_ref = c.id
+        GROUP BY latest.snapshot_date
+        ORDER BY latest.snapshot_date
+    """
+    bounds = ""
+    params = [str(team_key)]
+    if _date_bound(start_date):
+        bounds += " AND c.snapshot_date >= ?"
+        params.append(_date_bound(start_date))
+    if _date_bound(end_date):
+        bounds += " AND c.snapshot_date <= ?"
+        params.append(_date_bound(end_date))
+
+    connection = _connect(path_value)
+    try:
+        rows = connection.execute(query.format(bounds=bounds), params).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
@@ -1,17 +1,38 @@
+import os
+from datetime import date
+
 import numpy as np
 import pandas as pd
-from nba_api.stats.endpoints import playergamelog
-from nba_api.stats.static import players as nba_players
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
+
+import nba_schedule
+
+# nba_api, scikit-learn and joblib are imported inside the functions that use them
+# so importing this module stays cheap until a prediction actually runs.
 
 
 DEFAULT_SEASONS = ["2022-23", "2023-24", "2024-25", "2025-26"]
 MIN_ROWS_TO_TRAIN = 25
 DEFAULT_RISK = 0.2
+DEFAULT_MODEL_FILE = "injury_model.joblib"
+FEATURE_COLUMNS = [
+    "minutes_last_game",
+    "days_rest",
+    "is_back_to_back",
+    "games_last_14d",
+    "minutes_last_14d",
+    "avg_minutes_last_5",
+    "season_minutes",
+    "season_games_played",
+]
+SCHEDULE_FEATURE_COLUMNS = [
+    "team_games_missed_since_last",
+    "team_back_to_back",
+    "team_games_next_7d",
+]
 _PLAYER_ID_CACHE = {}
 _PLAYER_LOG_CACHE = {}
+_PLAYER_NAME_INDEX = {}
+_PUBLISHED_MODEL = {"path": None, "mtime": None, "bundle": None}
 
 
 def _to_float(value, default=0.0):
@@ -42,6 +63,20 @@ def _player_name_candidates(full_name):
     return candidates
 
 
+def load_player_name_index():
+    if _PLAYER_NAME_INDEX:
+        return _PLAYER_NAME_INDEX
+    from nba_api.stats.static import players as nba_players
+
+    index = {}
+    for item in nba_players.get_players():
+        key = str(item.get("full_name", "")).lower()
+        if key and key not in index:
+            index[key] = int(item["id"])
+    _PLAYER_NAME_INDEX.update(index)
+    return _PLAYER_NAME_INDEX
+
+
 def resolve_nba_player_id(player_name):
     if not player_name:
         return None
@@ -49,6 +84,14 @@ def resolve_nba_player_id(player_name):
         return _PLAYER_ID_CACHE[player_name]
 
     candidates = _player_name_candidates(player_name)
+    name_index = load_player_name_index()
+    for name in candidates:
+        if name.lower() in name_index:
+            _PLAYER_ID_CACHE[player_name] = name_index[name.lower()]
+            return _PLAYER_ID_CACHE[player_name]
+
+    from nba_api.stats.static import players as nba_players
+
     for name in candidates:
         matches = nba_players.find_players_by_full_name(name)
         exact = [m for m in matches if m.get("full_name", "").lower() == name.lower()]
@@ -67,6 +110,8 @@ def fetch_player_log(player_id, season):
     if cache_key in _PLAYER_LOG_CACHE:
         return _PLAYER_LOG_CACHE[cache_key]
 
+    from nba_api.stats.endpoints import playergamelog
+
     try:
         endpoint = playergamelog.PlayerGameLog(player_id=player_id, season=season, timeout=15)
         data_frames = endpoint.get_data_frames()
@@ -88,12 +133,52 @@ def fetch_player_log(player_id, season):
         return _PLAYER_LOG_CACHE[cache_key]
 
 
-def build_training_rows(game_log, sample_weight=1.0):
+def active_feature_columns(schedule=None):
+    if schedule is None:
+        return list(FEATURE_COLUMNS)
+    return FEATURE_COLUMNS + SCHEDULE_FEATURE_COLUMNS
+
+
+def _schedule_features(game_log, schedule):
+    if schedule is None or "MATCHUP" not in game_log.columns:
+        return None
+    # MATCHUP reads "LAL vs. GSW" or "LAL @ GSW"; the first token is the player's team.
+    teams = game_log["MATCHUP"].astype(str).str.split().str[0].tolist()
+    slots = nba_schedule.team_slots(schedule, teams)
+    current = nba_schedule.day_offsets(schedule, game_log["GAME_DATE"])
+    previous = np.concatenate((current[:1], current[:-1]))
+    following = np.concatenate((current[1:], current[-1:]))
+    next_slots = np.concatenate((slots[1:], [-1]))
+
+    # A schedule label needs both appearances inside the file's date range and
+    # the same team on both; after a trade the old team's games are not misses.
+    label_known = (
+        (slots >= 0)
+        & (next_slots == slots)
+        & nba_schedule.covers(schedule, current)
+        & nba_schedule.covers(schedule, following)
+    )
+
+    def as_feature(counts):
+        return np.where(counts >= 0, counts, np.nan).astype(float)
+
+    return {
+        "teams": teams,
+        "label_known": label_known,
+        "missed_since_last": as_feature(nba_schedule.games_between(schedule, slots, previous + 1, current - 1)),
+        "back_to_back": as_feature(nba_schedule.games_between(schedule, slots, current - 1, current - 1)),
+        "games_next_7d": as_feature(nba_schedule.games_between(schedule, slots, current + 1, current + 7)),
+        "missed_before_next": nba_schedule.games_between(schedule, slots, current + 1, following - 1),
+    }
+
+
+def build_training_rows(game_log, sample_weight=1.0, schedule=None):
     if game_log is None or game_log.empty or len(game_log) < 8:
         return [], None
 
     rows = []
     latest_features = None
+    team_schedule = _schedule_features(game_log, schedule)
 
     for index in range(1, len(game_log)):
         prev_slice = game_log.iloc[:index]
@@ -113,7 +198,11 @@ def build_training_rows(game_log, sample_weight=1.0):
         season_minutes = float(prev_slice["MIN_FLOAT"].sum())
         season_games = float(len(prev_slice))
 
-        if index < len(game_log) - 1:
+        on_schedule = team_schedule is not None and bool(team_schedule["label_known"][index])
+        if index < len(game_log) - 1 and on_schedule:
+            # Real label: the team played at least once before the player's next appearance.
+            miss_next_game = 1.0 if team_schedule["missed_before_next"][index] > 0 else 0.0
+        elif index < len(game_log) - 1:
             next_game = game_log.iloc[index + 1]
             next_gap_days = float((next_game["GAME_DATE"] - current_date).days)
             # Proxy label: a long gap to the next team game often reflects unavailability.
@@ -132,7 +221,16 @@ def build_training_rows(game_log, sample_weight=1.0):
             "season_games_played": season_games,
             "target_miss_next": miss_next_game,
             "sample_weight": sample_weight,
+            "game_date": current_date,
         }
+        if team_schedule is not None:
+            row.update(
+                {
+                    "team_games_missed_since_last": float(team_schedule["missed_since_last"][index]),
+                    "team_back_to_back": float(team_schedule["back_to_back"][index]),
+                    "team_games_next_7d": float(team_schedule["games_next_7d"][index]),
+                }
+            )
         rows.append(row)
 
         latest_features = {
@@ -145,6 +243,9 @@ def build_training_rows(game_log, sample_weight=1.0):
             "season_minutes": season_minutes,
             "season_games_played": season_games,
         }
+        if team_schedule is not None:
+            latest_features.update({key: row[key] for key in SCHEDULE_FEATURE_COLUMNS})
+            latest_features["team_abbreviation"] = team_schedule["teams"][index]
 
     return rows, latest_features
 
@@ -174,20 +275,89 @@ def _season_weights(seasons):
     return weights
 
 
-def predict_injury_risk_for_players(players, seasons=None):
+def serving_thread_limit():
+    try:
+        return max(1, int(os.getenv("INJURY_MODEL_THREADS", "1")))
+    except ValueError:
+        return 1
+
+
+def request_training_enabled():
+    # Fitting inside a web request is opt-in; publish a model with train_model.py instead.
+    return os.getenv("INJURY_MODEL_TRAIN_ON_REQUEST", "").strip().lower() in ("1", "true", "yes")
+
+
+def resolve_model_path(path_value=None):
+    value = path_value or os.getenv("INJURY_MODEL_FILE", DEFAULT_MODEL_FILE)
+    if os.path.isabs(value):
+        return value
+    return os.path.join(os.path.dirname(__file__), value)
+
+
+def load_published_model(path_value=None):
+    model_path = resolve_model_path(path_value)
+    if not os.path.exists(model_path):
+        return None
+    mtime = os.path.getmtime(model_path)
+    if _PUBLISHED_MODEL["path"] == model_path and _PUBLISHED_MODEL["mtime"] == mtime:
+        return _PUBLISHED_MODEL["bundle"]
+    import joblib
+
+    try:
+        bundle = joblib.load(model_path)
+    except Exception:
+        return None
+    _apply_serving_threads(bundle["model"])
+    _PUBLISHED_MODEL.update({"path": model_path, "mtime": mtime, "bundle": bundle})
+    return bundle
+
+
+def _apply_serving_threads(model):
+    # n_jobs is pickled with the estimator and threadpool_limits does not reach
+    # joblib's thread backend, so cap it from this process's environment.
+    steps = getattr(model, "named_steps", {})
+    for estimator in [*steps.values(), model]:
+        if "n_jobs" in estimator.get_params(deep=False):
+            estimator.set_params(n_jobs=serving_thread_limit())
+
+
+def publish_model(bundle, path_value=None):
+    import joblib
+
+    model_path = resolve_model_path(path_value)
+    temp_path = f"{model_path}.tmp"
+    joblib.dump(bundle, temp_path)
+    # Atomic swap so serving workers never load a half-written file.
+    os.replace(temp_path, model_path)
+    return model_path
+
+
+def build_default_model(n_jobs=None):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline(
+        [
+            ("imputer", SimpleImputer(strategy="median")),
+            (
+                "rf",
+                RandomForestClassifier(
+                    n_estimators=350,
+                    max_depth=10,
+                    min_samples_leaf=3,
+                    random_state=42,
+                    n_jobs=n_jobs or serving_thread_limit(),
+                ),
+            ),
+        ]
+    )
+
+
+def collect_player_features(players, seasons=None, include_training=True):
     seasons = _normalize_seasons(seasons)
     season_weight = _season_weights(seasons)
-
-    feature_columns = [
-        "minutes_last_game",
-        "days_rest",
-        "is_back_to_back",
-        "games_last_14d",
-        "minutes_last_14d",
-        "avg_minutes_last_5",
-        "season_minutes",
-        "season_games_played",
-    ]
+    schedule = nba_schedule.load_schedule_index()
 
     train_rows = []
     latest_feature_rows = {}
@@ -201,16 +371,96 @@ def predict_injury_risk_for_players(players, seasons=None):
             continue
 
         chosen_latest = None
-        for season in seasons:
+        # Without training, only the most recent season with games is needed.
+        season_order = seasons if include_training else list(reversed(seasons))
+        for season in season_order:
             game_log = fetch_player_log(nba_player_id, season=season)
-            rows, latest = build_training_rows(game_log, sample_weight=season_weight.get(season, 1.0))
-            if rows:
+            rows, latest = build_training_rows(
+                game_log,
+                sample_weight=season_weight.get(season, 1.0),
+                schedule=schedule,
+            )
+            if rows and include_training:
                 train_rows.extend(rows)
             if latest:
                 chosen_latest = latest
+                if not include_training:
+                    break
         if chosen_latest:
             latest_feature_rows[name] = chosen_latest
 
+    return train_rows, latest_feature_rows, default_risk
+
+
+def warm_up_model(path_value=None):
+    bundle = load_published_model(path_value)
+    if bundle is None:
+        return False
+    feature_columns = bundle.get("feature_columns", FEATURE_COLUMNS)
+    # One throwaway prediction pays sklearn's first-call validation costs up front.
+    probe = {"__warmup__": dict.fromkeys(feature_columns, 0.0)}
+    _score_latest_features(bundle["model"], probe, "warmup", {}, feature_columns)
+    return True
+
+
+def _score_latest_features(model, latest_feature_rows, source, output, feature_columns=FEATURE_COLUMNS):
+    from threadpoolctl import threadpool_limits
+
+    if not latest_feature_rows:
+        return
+    names = list(latest_feature_rows.keys())
+    input_frame = pd.DataFrame([latest_feature_rows[name] for name in names], columns=feature_columns)
+    with threadpool_limits(limits=serving_thread_limit()):
+        probabilities = model.predict_proba(input_frame)[:, 1]
+    for name, prob in zip(names, probabilities):
+        prob = float(np.clip(prob, 0.02, 0.95))
+        output[name] = {
+            "injury_risk_probability": round(prob, 4),
+            "availability_probability": round(1.0 - prob, 4),
+            "source": source,
+        }
+
+
+def _add_upcoming_games(latest_feature_rows, output):
+    schedule = nba_schedule.load_schedule_index()
+    if schedule is None:
+        return
+    today = date.today()
+    for name, row in latest_feature_rows.items():
+        upcoming = nba_schedule.count_upcoming_games(schedule, row.get("team_abbreviation"), today)
+        if name in output and upcoming is not None:
+            output[name]["upcoming_games_7d"] = upcoming
+
+
+def predict_injury_risk_for_players(players, seasons=None, allow_training=None):
+    seasons = _normalize_seasons(seasons)
+    published = load_published_model()
+    if allow_training is None:
+        allow_training = request_training_enabled()
+
+    if published is None and not allow_training:
+        # Without a published model, don't fetch game logs or fit a model inside a request.
+        output = {}
+        for player in players:
+            risk = _status_default_risk(player.get("status", ""))
+            output[player.get("name", "Unknown")] = {
+                "injury_risk_probability": round(risk, 4),
+                "availability_probability": round(1.0 - risk, 4),
+                "source": "default",
+            }
+        return {
+            "risk_by_player_name": output,
+            "trained": False,
+            "model_rows": 0,
+            "note": "No published injury model; using roster-status defaults. Run train_model.py to publish one.",
+        }
+
+    train_rows, latest_feature_rows, default_risk = collect_player_features(
+        players,
+        seasons=seasons,
+        include_training=published is None,
+    )
+
     output = {}
     for player in players:
         name = player.get("name", "Unknown")
@@ -220,7 +470,24 @@ def predict_injury_risk_for_players(players, seasons=None):
             "source": "default",
         }
 
+    if published is not None:
+        _score_latest_features(
+            published["model"],
+            latest_feature_rows,
+            published.get("name", "published"),
+            output,
+            published.get("feature_columns", FEATURE_COLUMNS),
+        )
+        _add_upcoming_games(latest_feature_rows, output)
+        return {
+            "risk_by_player_name": output,
+            "trained": True,
+            "model_rows": published.get("rows", 0),
+            "note": f"Published {published.get('name', 'model')} model trained {published.get('trained_at', '')}.",
+        }
+
     if len(train_rows) < MIN_ROWS_TO_TRAIN:
+        _add_upcoming_games(latest_feature_rows, output)
         return {
             "risk_by_player_name": output,
             "trained": False,
@@ -228,12 +495,14 @@ def predict_injury_risk_for_players(players, seasons=None):
             "note": "",
         }
 
+    feature_columns = active_feature_columns(nba_schedule.load_schedule_index())
     train_frame = pd.DataFrame(train_rows)
-    x_train = train_frame[feature_columns]
+    x_train = train_frame.reindex(columns=feature_columns)
     y_train = train_frame["target_miss_next"].astype(int)
     sample_weight = train_frame["sample_weight"].astype(float).values
 
     if y_train.nunique() < 2:
+        _add_upcoming_games(latest_feature_rows, output)
         return {
             "risk_by_player_name": output,
             "trained": False,
@@ -241,32 +510,10 @@ def predict_injury_risk_for_players(players, seasons=None):
             "note": "",
         }
 
-    model = Pipeline(
-        [
-            ("imputer", SimpleImputer(strategy="median")),
-            (
-                "rf",
-                RandomForestClassifier(
-                    n_estimators=350,
-                    max_depth=10,
-                    min_samples_leaf=3,
-                    random_state=42,
-                    n_jobs=-1,
-                ),
-            ),
-        ]
-    )
+    model = build_default_model()
     model.fit(x_train, y_train, rf__sample_weight=sample_weight)
-
-    for name, row in latest_feature_rows.items():
-        input_frame = pd.DataFrame([row], columns=feature_columns)
-        prob = float(model.predict_proba(input_frame)[0][1])
-        prob = float(np.clip(prob, 0.02, 0.95))
-        output[name] = {
-            "injury_risk_probability": round(prob, 4),
-            "availability_probability": round(1.0 - prob, 4),
-            "source": "random_forest",
-        }
+    _score_latest_features(model, latest_feature_rows, "random_forest", output, feature_columns)
+    _add_upcoming_games(latest_feature_rows, output)
 
     return {
         "risk_by_player_name": output,
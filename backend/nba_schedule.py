@@ -0,0 +1,152 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_SCHEDULE_FILE = "nba_schedule.csv"
+SCHEDULE_COLUMNS = ["TEAM_ABBREVIATION", "GAME_DATE"]
+# Third digit of an NBA gameId: 1 preseason, 2 regular season, 3 All-Star,
+# 4 playoffs, 5 play-in, 6 NBA Cup final. Player game logs are fetched for the
+# regular season only, so any other type would read as a missed game.
+COUNTED_GAME_TYPES = {"2"}
+_SCHEDULE_INDEX = {"path": None, "mtime": None, "index": None}
+
+
+def resolve_schedule_path(path_value=None):
+    value = path_value or os.getenv("NBA_SCHEDULE_FILE", DEFAULT_SCHEDULE_FILE)
+    if os.path.isabs(value):
+        return value
+    return os.path.join(os.path.dirname(__file__), value)
+
+
+def build_schedule_index(frame):
+    if frame is None or frame.empty:
+        return None
+    dates = pd.to_datetime(frame["GAME_DATE"], errors="coerce").values.astype("datetime64[D]")
+    teams = frame["TEAM_ABBREVIATION"].astype(str).str.upper().to_numpy()
+    valid = ~np.isnat(dates)
+    if not valid.any():
+        return None
+    dates = dates[valid]
+    teams = teams[valid]
+
+    origin = dates.min()
+    day_count = int((dates.max() - origin).astype(int)) + 1
+    slot_by_team = {team: slot for slot, team in enumerate(sorted(set(teams)))}
+
+    played = np.zeros((len(slot_by_team), day_count), dtype=np.int32)
+    slots = np.array([slot_by_team[team] for team in teams], dtype=np.int64)
+    offsets = (dates - origin).astype(np.int64)
+    played[slots, offsets] = 1
+
+    # cumulative[t, d] = games team t played on days before offset d, so any
+    # inclusive date range is answered with two array reads.
+    cumulative = np.zeros((len(slot_by_team), day_count + 1), dtype=np.int32)
+    np.cumsum(played, axis=1, dtype=np.int32, out=cumulative[:, 1:])
+    return {"origin": origin, "days": day_count, "teams": slot_by_team, "cumulative": cumulative}
+
+
+def load_schedule_index(path_value=None):
+    schedule_path = resolve_schedule_path(path_value)
+    if not os.path.exists(schedule_path):
+        return None
+    mtime = os.path.getmtime(schedule_path)
+    if _SCHEDULE_INDEX["path"] == schedule_path and _SCHEDULE_INDEX["mtime"] == mtime:
+        return _SCHEDULE_INDEX["index"]
+    try:
+        frame = pd.read_csv(schedule_path, usecols=SCHEDULE_COLUMNS)
+    except Exception:
+        return None
+    index = build_schedule_index(frame)
+    _SCHEDULE_INDEX.update({"path": schedule_path, "mtime": mtime, "index": index})
+    return index
+
+
+def day_offsets(index, dates):
+    values = pd.to_datetime(pd.Series(dates)).values.astype("datetime64[D]")
+    return (values - index["origin"]).astype(np.int64)
+
+
+def team_slots(index, teams):
+    return np.array([index["teams"].get(str(team).upper(), -1) for team in teams], dtype=np.int64)
+
+
+def covers(index, offsets):
+    offsets = np.asarray(offsets, dtype=np.int64)
+    return (offsets >= 0) & (offsets < index["days"])
+
+
+def games_between(index, slots, start_offsets, end_offsets):
+    # -1 means unknown: the team is not indexed or a non-empty range reaches past
+    # the dates the schedule file covers. Clamping those would read as "0 games".
+    slots = np.asarray(slots, dtype=np.int64)
+    start = np.asarray(start_offsets, dtype=np.int64)
+    end = np.asarray(end_offsets, dtype=np.int64)
+    empty = end < start
+    known = (slots >= 0) & (empty | (covers(index, start) & covers(index, end)))
+
+    safe_slots = np.where(slots >= 0, slots, 0)
+    safe_start = np.clip(start, 0, index["days"])
+    safe_end = np.clip(end + 1, 0, index["days"])
+    cumulative = index["cumulative"]
+    counts = cumulative[safe_slots, safe_end] - cumulative[safe_slots, safe_start]
+    counts = np.where(empty, 0, counts)
+    return np.where(known, counts, -1)
+
+
+def count_upcoming_games(index, team, start_date, days=7):
+    if index is None or not team:
+        return None
+    slots = team_slots(index, [team])
+    if slots[0] < 0:
+        return None
+    start = day_offsets(index, [start_date])
+    count = int(games_between(index, slots, start, start + days - 1)[0])
+    return count if count >= 0 else None
+
+
+def fetch_season_schedule(season):
+    from nba_api.stats.endpoints import scheduleleaguev2
+
+    # The published league schedule lists future games too, unlike game logs.
+    endpoint = scheduleleaguev2.ScheduleLeagueV2(season=season, timeout=30)
+    games = endpoint.season_games.get_data_frame()
+    if games.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    games = games[games["gameId"].astype(str).str[2].isin(COUNTED_GAME_TYPES)]
+    game_dates = pd.to_datetime(games["gameDateEst"], errors="coerce").dt.strftime("%Y-%m-%d")
+    home = pd.DataFrame({"TEAM_ABBREVIATION": games["homeTeam_teamTricode"], "GAME_DATE": game_dates})
+    away = pd.DataFrame({"TEAM_ABBREVIATION": games["awayTeam_teamTricode"], "GAME_DATE": game_dates})
+    return pd.concat([home, away], ignore_index=True).dropna()
+
+
+def write_schedule_file(seasons, path_value=None):
+    frames = [fetch_season_schedule(season) for season in seasons]
+    frame = pd.concat(frames, ignore_index=True).drop_duplicates().sort_values(SCHEDULE_COLUMNS[::-1])
+    schedule_path = resolve_schedule_path(path_value)
+    frame.to_csv(schedule_path, index=False)
+    return schedule_path, len(frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the local NBA team schedule file.")
+    parser.add_argument(
+        "--seasons",
+        help="Comma-separated NBA seasons, e.g. 2024-25,2025-26; defaults to the injury model's training seasons.",
+    )
+    parser.add_argument("--output", help="Output CSV; defaults to NBA_SCHEDULE_FILE.")
+    args = parser.parse_args(argv)
+    if args.seasons:
+        seasons = [item.strip() for item in args.seasons.split(",") if item.strip()]
+    else:
+        from injury_prediction import DEFAULT_SEASONS
+
+        seasons = list(DEFAULT_SEASONS)
+    schedule_path, rows = write_schedule_file(seasons, path_value=args.output)
+    print(f"Wrote {rows} team games to {schedule_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import os
 
 from player_value import calc_fantasy_value, to_float
-import yahoo_fantasy_api as yfa
-from yahoo_oauth import OAuth2
+import yahoo_session
 
 
 def load_dotenv(path=None):
@@ -37,6 +36,8 @@ def league_prefix_env():
 
 
 def build_context(league_key=None, team_key=None):
+    import yahoo_fantasy_api as yfa
+
     load_dotenv()
 
     game_code = os.getenv("YAHOO_GAME_CODE", "nba")
@@ -46,7 +47,7 @@ def build_context(league_key=None, team_key=None):
         raise ValueError()
     final_team_key = team_key or f"{final_league_key}.t.1"
 
-    oauth = OAuth2(None, None, from_file=oauth_file)
+    oauth = yahoo_session.get_oauth_session(oauth_file)
     game = yfa.Game(oauth, game_code)
     league = game.to_league(final_league_key)
     return league, final_team_key
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+import injury_prediction
+import nba_schedule
+import trades as team_trades
+
+
+CANDIDATE_GRIDS = {
+    "random_forest": {
+        "model__n_estimators": [100, 200, 350],
+        "model__max_depth": [6, 10, None],
+        "model__min_samples_leaf": [1, 3, 5],
+    },
+    "hist_gradient_boosting": {
+        "model__learning_rate": [0.03, 0.1, 0.2],
+        "model__max_depth": [3, 6, None],
+        "model__max_iter": [100, 200],
+        "model__min_samples_leaf": [10, 20],
+    },
+    "logistic_regression": {
+        "model__C": [0.1, 1.0, 10.0],
+        "model__class_weight": [None, "balanced"],
+    },
+}
+
+
+def build_candidate(name):
+    if name == "random_forest":
+        estimator = RandomForestClassifier(random_state=42, n_jobs=1)
+        return Pipeline([("imputer", SimpleImputer(strategy="median")), ("model", estimator)])
+    if name == "hist_gradient_boosting":
+        estimator = HistGradientBoostingClassifier(random_state=42)
+        return Pipeline([("imputer", SimpleImputer(strategy="median")), ("model", estimator)])
+    if name == "logistic_regression":
+        estimator = LogisticRegression(max_iter=1000)
+        return Pipeline(
+            [
+                ("imputer", SimpleImputer(strategy="median")),
+                ("scaler", StandardScaler()),
+                ("model", estimator),
+            ]
+        )
+    raise ValueError(name)
+
+
+def evaluate_candidate(name, params, x_values, y_values, weights, n_splits):
+    # The process pool already uses every core; keep OpenMP/BLAS in each worker to one thread.
+    with threadpool_limits(limits=1):
+        return _evaluate_candidate(name, params, x_values, y_values, weights, n_splits)
+
+
+def _evaluate_candidate(name, params, x_values, y_values, weights, n_splits):
+    accuracies = []
+    aucs = []
+    latencies = []
+    for train_index, test_index in TimeSeriesSplit(n_splits=n_splits).split(x_values):
+        y_train = y_values[train_index]
+        y_test = y_values[test_index]
+        if len(np.unique(y_train)) < 2:
+            continue
+        model = build_candidate(name).set_params(**params)
+        model.fit(x_values[train_index], y_train, model__sample_weight=weights[train_index])
+
+        started = time.perf_counter()
+        probabilities = model.predict_proba(x_values[test_index])[:, 1]
+        latencies.append((time.perf_counter() - started) * 1000.0 / max(len(test_index), 1))
+
+        accuracies.append(accuracy_score(y_test, (probabilities >= 0.5).astype(int)))
+        if len(np.unique(y_test)) > 1:
+            aucs.append(roc_auc_score(y_test, probabilities))
+
+    return {
+        "name": name,
+        "params": params,
+        "folds": len(accuracies),
+        "accuracy": round(float(np.mean(accuracies)), 4) if accuracies else None,
+        "roc_auc": round(float(np.mean(aucs)), 4) if aucs else None,
+        "latency_ms_per_row": round(float(np.mean(latencies)), 5) if latencies else None,
+    }
+
+
+def sample_configurations(max_configs, random_state=42):
+    configurations = []
+    for name, grid in CANDIDATE_GRIDS.items():
+        grid_size = int(np.prod([len(values) for values in grid.values()]))
+        sampler = ParameterSampler(grid, n_iter=min(max_configs, grid_size), random_state=random_state)
+        configurations.extend((name, dict(params)) for params in sampler)
+    return configurations
+
+
+def collect_league_players(league_key=None):
+    league, _ = team_trades.build_context(league_key=league_key)
+    players = []
+    for team_meta in team_trades.get_league_teams(league):
+        team_key = team_meta.get("team_key")
+        if team_key:
+            players.extend(league.to_team(team_key).roster())
+    return players
+
+
+def build_training_frame(players, seasons=None):
+    train_rows, _, _ = injury_prediction.collect_player_features(players, seasons=seasons)
+    if not train_rows:
+        return pd.DataFrame()
+    # Time-series CV needs rows in chronological order across all players.
+    return pd.DataFrame(train_rows).sort_values("game_date", kind="stable").reset_index(drop=True)
+
+
+def select_best(results, max_latency_ms=None):
+    # Accuracy at a 0.5 threshold rewards predicting the majority class on this
+    # imbalanced label, so rank on ROC AUC and use accuracy only to break ties.
+    eligible = [item for item in results if item["roc_auc"] is not None]
+    if max_latency_ms is not None:
+        eligible = [item for item in eligible if item["latency_ms_per_row"] <= max_latency_ms]
+    if not eligible:
+        return None
+    return sorted(
+        eligible,
+        key=lambda item: (-item["roc_auc"], -item["accuracy"], item["latency_ms_per_row"]),
+    )[0]
+
+
+def train_and_publish(
+    players,
+    seasons=None,
+    n_splits=5,
+    max_configs=6,
+    workers=None,
+    max_latency_ms=None,
+    model_path=None,
+    dry_run=False,
+):
+    seasons = injury_prediction._normalize_seasons(seasons)
+    frame = build_training_frame(players, seasons=seasons)
+    if len(frame) < injury_prediction.MIN_ROWS_TO_TRAIN or frame["target_miss_next"].nunique() < 2:
+        return {"published": False, "rows": len(frame), "note": "Not enough labelled rows to train."}
+
+    feature_columns = injury_prediction.active_feature_columns(nba_schedule.load_schedule_index())
+    features = frame.reindex(columns=feature_columns).astype(float)
+    x_values = features.to_numpy()
+    y_values = frame["target_miss_next"].astype(int).to_numpy()
+    weights = frame["sample_weight"].astype(float).to_numpy()
+
+    configurations = sample_configurations(max_configs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(evaluate_candidate, name, params, x_values, y_values, weights, n_splits)
+            for name, params in configurations
+        ]
+        results = [future.result() for future in futures]
+
+    best = select_best(results, max_latency_ms=max_latency_ms)
+    report = {"published": False, "rows": len(frame), "results": results, "best": best}
+    if best is None:
+        report["note"] = "No candidate met the selection constraints."
+        return report
+
+    if dry_run:
+        return report
+
+    model = build_candidate(best["name"]).set_params(**best["params"])
+    # Refit on the named frame so serving-time DataFrames match the fitted feature names.
+    model.fit(features, y_values, model__sample_weight=weights)
+
+    bundle = {
+        "model": model,
+        "name": best["name"],
+        "params": best["params"],
+        "feature_columns": feature_columns,
+        "metrics": {key: best[key] for key in ("accuracy", "roc_auc", "latency_ms_per_row")},
+        "seasons": seasons,
+        "rows": len(frame),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+    }
+    report["published"] = True
+    report["model_path"] = injury_prediction.publish_model(bundle, path_value=model_path)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train and publish the injury risk model.")
+    parser.add_argument("--players", help="Comma-separated player names; defaults to every rostered player in the league.")
+    parser.add_argument("--league-key", help="Yahoo league key; defaults to YAHOO_LEAGUE_INFO.")
+    parser.add_argument("--seasons", help="Comma-separated NBA seasons, e.g. 2023-24,2024-25.")
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--max-configs", type=int, default=6, help="Hyperparameter samples per model family.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-latency-ms", type=float, help="Reject models slower than this per row.")
+    parser.add_argument("--model-file", help="Output path; defaults to INJURY_MODEL_FILE.")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without publishing.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.players:
+        players = [{"name": name.strip()} for name in args.players.split(",") if name.strip()]
+    else:
+        players = collect_league_players(league_key=args.league_key)
+    seasons = [item.strip() for item in args.seasons.split(",")] if args.seasons else None
+
+    report = train_and_publish(
+        players,
+        seasons=seasons,
+        n_splits=args.splits,
+        max_configs=args.max_configs,
+        workers=args.workers,
+        max_latency_ms=args.max_latency_ms,
+        model_path=args.model_file,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
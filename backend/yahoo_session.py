@@ -0,0 +1,18 @@
+import threading
+
+
+_OAUTH_SESSIONS = {}
+_OAUTH_LOCK = threading.Lock()
+
+
+def get_oauth_session(oauth_file):
+    from yahoo_oauth import OAuth2
+
+    with _OAUTH_LOCK:
+        session = _OAUTH_SESSIONS.get(oauth_file)
+        if session is None:
+            session = OAuth2(None, None, from_file=oauth_file)
+            _OAUTH_SESSIONS[oauth_file] = session
+        elif not session.token_is_valid():
+            session.refresh_access_token()
+        return session
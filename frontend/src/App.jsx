@@ -24,10 +24,11 @@ function App() {
   const fetchTeams = async () => {
     try {
       setSetupLoading(true)
-      const response = await fetch('http://localhost:5000/api/league/teams')
+      const response = await fetch('http://localhost:5000/api/league/dashboard?fields=team_name,team_number')
       const data = await response.json()
       if (response.ok) {
-        const nextTeams = data.teams || []
+        // The dashboard orders teams by value rank; list them in league order instead.
+        const nextTeams = [...(data.teams || [])].sort((a, b) => Number(a.team_number) - Number(b.team_number))
         setTeams(nextTeams)
         if (nextTeams.length > 0) {
           setTeamNumber(nextTeams[0].team_number || '')
@@ -12,11 +12,12 @@ export default function GeneralStatistics({ teamNumber }) {
     const load = async () => {
       try {
         setLoading(true)
-        const query = `team_number=${encodeURIComponent(teamNumber)}`
-        const response = await fetch(`http://localhost:5000/api/team/value-stats?${query}`)
+        const query = 'fields=team_number,summary,players&player_fields=name,fantasy_value'
+        const response = await fetch(`http://localhost:5000/api/league/dashboard?${query}`)
         const data = await response.json()
         if (response.ok) {
-          setPayload(data)
+          const team = (data.teams || []).find((item) => String(item.team_number) === String(teamNumber))
+          setPayload(team || null)
         }
       } catch {
       } finally {